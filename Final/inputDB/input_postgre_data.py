@@ -22,10 +22,12 @@ LangFlow는 이 서버에 주기적으로 요청을 보내고,
 """
 
 import os
+import io
 import glob
 import csv
-import psycopg2
-from psycopg2.extras import execute_batch
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg2.pool import ThreadedConnectionPool
 
 from http.server import HTTPServer, BaseHTTPRequestHandler  # ★ 추가
 
@@ -40,6 +42,12 @@ DB_INFO = dict(
     password="admin123",
 )
 
+# CSV 파일 동시 적재 수 (파일 하나당 커넥션 하나)
+LOAD_MAX_WORKERS = max(1, int(os.getenv("LOAD_MAX_WORKERS", "4")))
+
+# 키워드 부분일치(ILIKE) 검색 대상 컬럼 -> pg_trgm 인덱스 생성 대상
+SEARCH_INDEX_COLUMNS = ("type", "lastwritetimestamp", "description", "tag")
+
 # =========================
 # 1. 경로 탐색
 # =========================
@@ -72,10 +80,14 @@ def iter_csv_files(tagged_dir: str):
 # 2. DB 접속 & 테이블 준비/초기화
 # =========================
 
-def get_connection():
-    conn = psycopg2.connect(**DB_INFO)
-    conn.autocommit = False
-    return conn
+def get_pool(max_workers: int) -> ThreadedConnectionPool:
+    """
+    CSV 적재 워커 수만큼 커넥션을 가진 풀 생성.
+    (autocommit=False 기본값 그대로, 파일 단위로 commit)
+    minconn == maxconn: putconn 은 유휴 커넥션이 minconn 미만일 때만 보관하고
+    나머지는 close 하므로, 둘을 같게 둬야 파일마다 재연결하지 않는다.
+    """
+    return ThreadedConnectionPool(max_workers, max_workers, **DB_INFO)
 
 
 def reset_artifact_all(conn):
@@ -94,99 +106,161 @@ def reset_artifact_all(conn):
     """
     with conn.cursor() as cur:
         cur.execute(create_sql)
+        # 적재 중에는 GIN 인덱스 유지 비용이 크므로 먼저 지우고, 적재 후 다시 만든다
+        for col in SEARCH_INDEX_COLUMNS:
+            cur.execute(f"DROP INDEX IF EXISTS idx_artifact_all_{col}_trgm;")
         cur.execute("TRUNCATE TABLE artifact_all;")
     conn.commit()
     print("[INFO] artifact_all table has been reset (TRUNCATE).")
 
+
+def create_search_indexes(conn):
+    """
+    키워드 검색(LangFlow ForensicTagQueryAndSave)의
+        COALESCE(<col>::text, '') ILIKE '%kw%'
+    조건이 순차 스캔 대신 인덱스를 타도록 pg_trgm GIN 인덱스를 만든다.
+    (쿼리와 같은 식으로 만들어야 플래너가 인덱스를 사용함)
+
+    pg_trgm 확장을 만들 권한이 없으면 경고만 찍고 넘어간다. (검색은 그대로 동작)
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            for col in SEARCH_INDEX_COLUMNS:
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_artifact_all_{col}_trgm "
+                    f"ON artifact_all USING GIN ((COALESCE({col}::text, '')) gin_trgm_ops);"
+                )
+            cur.execute("ANALYZE artifact_all;")
+        conn.commit()
+        print("[INFO] artifact_all trigram indexes created.")
+    except Exception as e:
+        conn.rollback()
+        print(f"[WARN] Failed to create trigram indexes on artifact_all: {e}")
+
 # =========================
 # 3. CSV → artifact_all 적재
 # =========================
 
+# artifact_all 컬럼별로 허용하는 CSV 헤더 이름 (앞에 있는 것이 우선)
+FIELD_HEADER_CANDIDATES = (
+    ("Type", "type"),
+    # ✅ LastWriteTimestamp / LastWriteTimestemp / time 등 여러 케이스 방어
+    (
+        "LastWriteTimestamp",   # 정식
+        "lastwritetimestamp",   # 소문자
+        "LastWriteTimestemp",   # 오타(대문자)
+        "lastwritetimestemp",   # 오타(소문자)
+        "time",                 # 다른 도구에서 time 으로만 뽑힌 경우
+    ),
+    # ✅ description / desc / descrition 등 다양한 케이스 방어
+    (
+        "description",   # 정식(소문자)
+        "Description",   # 정식(대문자)
+        "desc", "Desc",  # 축약형
+        "descrition",    # 오타
+        "Descrition",    # 오타(대문자)
+    ),
+    (
+        "tag", "Tag",   # 기본
+        "tags", "Tags"  # 복수형
+    ),
+)
+
+# COPY 한 번에 보낼 row 수 (메모리는 이 크기만큼만 사용)
+COPY_CHUNK_ROWS = 50_000
+
+# FORCE_NOT_NULL: 빈 값도 NULL이 아니라 '' 로 적재 (기존 INSERT와 동일)
+COPY_SQL = """
+COPY artifact_all (type, lastwritetimestamp, description, tag)
+FROM STDIN WITH (
+    FORMAT csv,
+    FORCE_NOT_NULL (type, lastwritetimestamp, description, tag)
+);
+"""
+
+
+def _copy_rows(cur, buf: io.StringIO):
+    buf.seek(0)
+    cur.copy_expert(COPY_SQL, buf)
+    buf.seek(0)
+    buf.truncate()
+
+
 def load_csv_to_artifact_all(conn, csv_path: str):
     print(f"[INFO] Loading CSV -> artifact_all: {csv_path}")
 
-    rows_to_insert = []
+    inserted = 0
 
-    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f, conn.cursor() as cur:
+        reader = csv.reader(f)
 
         # 헤더가 없으면 스킵
-        if not reader.fieldnames:
+        header = next(reader, None)
+        if not header:
             print(f"[WARN] {csv_path}: fieldnames is None. Skipping.")
             return
 
-        # 대소문자/공백 방어용 get_field
-        def get_field(row: dict, *candidates) -> str:
-            """
-            row에서 candidates 중 하나에 해당하는 키가 있으면 그 값을 반환.
-            키 이름은 그대로 비교하되, row는 norm_row(공백 제거) 기준으로 사용.
-            """
-            for key in candidates:
-                if key in row and row[key] is not None:
-                    return row[key]
-            return ""
+        # 대소문자/공백 방어: strip 한 헤더 기준, 같은 이름이 여러 번이면 마지막 컬럼 사용
+        header_idx = {(h or "").strip(): i for i, h in enumerate(header)}
+
+        # 컬럼별 후보 인덱스 목록 (행이 짧으면 다음 후보로 넘어감)
+        field_indices = [
+            [header_idx[key] for key in candidates if key in header_idx]
+            for candidates in FIELD_HEADER_CANDIDATES
+        ]
+
+        buf = io.StringIO()
+        # QUOTE_ALL: lineterminator가 "\n"이면 csv 모듈이 단독 "\r"을 따옴표로 감싸지 않는데,
+        # COPY csv는 따옴표 없는 CR을 거부하므로 모든 필드를 항상 감싼다
+        writer = csv.writer(buf, lineterminator="\n", quoting=csv.QUOTE_ALL)
+        pending = 0
 
         for line_no, row in enumerate(reader, start=2):
+            if not row:
+                continue
             try:
-                # DictReader는 원래 헤더 그대로 키로 쓰니까, strip 한 버전도 같이 사용
-                norm_row = { (k or "").strip(): v for k, v in row.items() }
-
-                type_val = (get_field(norm_row, "Type", "type") or "").strip()
-
-                # ✅ LastWriteTimestamp / LastWriteTimestemp / time 등 여러 케이스 방어
-                ts_val = (
-                    get_field(
-                        norm_row,
-                        "LastWriteTimestamp",   # 정식
-                        "lastwritetimestamp",   # 소문자
-                        "LastWriteTimestemp",   # 오타(대문자)
-                        "lastwritetimestemp",   # 오타(소문자)
-                        "time",                 # 다른 도구에서 time 으로만 뽑힌 경우
-                    ) or ""
-                ).strip()
-
-                # ✅ description / desc / descrition 등 다양한 케이스 방어
-                desc_val = (
-                    get_field(
-                        norm_row,
-                        "description",   # 정식(소문자)
-                        "Description",   # 정식(대문자)
-                        "desc", "Desc",  # 축약형
-                        "descrition",    # 오타
-                        "Descrition",    # 오타(대문자)
-                    ) or ""
-                ).strip()
-
-                tag_val = (
-                    get_field(
-                        norm_row,
-                        "tag", "Tag",   # 기본
-                        "tags", "Tags"  # 복수형
-                    ) or ""
-                ).strip()
-
-                rows_to_insert.append(
-                    (type_val, ts_val, desc_val, tag_val)
-                )
-
+                n = len(row)
+                writer.writerow([
+                    next((row[i] for i in idxs if i < n), "").strip()
+                    for idxs in field_indices
+                ])
+                pending += 1
             except Exception as e:
                 # 한 줄에서 뭔가 터져도 전체 로드는 계속 진행
                 print(f"[WARN] {csv_path} line {line_no}: {e}")
+                continue
 
-    if not rows_to_insert:
+            if pending >= COPY_CHUNK_ROWS:
+                _copy_rows(cur, buf)
+                inserted += pending
+                pending = 0
+
+        if pending:
+            _copy_rows(cur, buf)
+            inserted += pending
+
+    if not inserted:
         print(f"[INFO] No valid rows found in {csv_path}. Skipping.")
         return
 
-    insert_sql = """
-    INSERT INTO artifact_all (type, lastwritetimestamp, description, tag)
-    VALUES (%s, %s, %s, %s);
-    """
-
-    with conn.cursor() as cur:
-        execute_batch(cur, insert_sql, rows_to_insert, page_size=1000)
     conn.commit()
 
-    print(f"[INFO] Inserted {len(rows_to_insert)} rows from {csv_path}.")
+    print(f"[INFO] Inserted {inserted} rows from {csv_path}.")
+
+def _load_one(pool: ThreadedConnectionPool, csv_path: str):
+    """
+    풀에서 커넥션 하나를 빌려 CSV 한 개를 적재하고 반납.
+    한 파일이 실패해도 나머지 파일 적재는 계속 진행.
+    """
+    conn = pool.getconn()
+    try:
+        load_csv_to_artifact_all(conn, csv_path)
+    except Exception as e:
+        conn.rollback()
+        print(f"[WARN] {csv_path}: load failed, rolled back: {e}")
+    finally:
+        pool.putconn(conn)
 
 # =========================
 # 4. 완료 신호용 HTTP 서버
@@ -252,20 +326,36 @@ def main():
     for d in tagged_dirs:
         print(f"  - {d}")
 
-    conn = get_connection()
+    all_csvs = []
+    for tagged_dir in tagged_dirs:
+        print(f"[INFO] Scanning CSV files in {tagged_dir} ...")
+        all_csvs.extend(iter_csv_files(tagged_dir))
+
+    pool = get_pool(LOAD_MAX_WORKERS)
     try:
         # 테이블 생성 + 내용 초기화
-        reset_artifact_all(conn)
-
-        for tagged_dir in tagged_dirs:
-            print(f"[INFO] Scanning CSV files in {tagged_dir} ...")
-            for csv_path in iter_csv_files(tagged_dir):
-                load_csv_to_artifact_all(conn, csv_path)
+        conn = pool.getconn()
+        try:
+            reset_artifact_all(conn)
+        finally:
+            pool.putconn(conn)
+
+        # CSV 파일들은 서로 독립 → 파일 단위로 병렬 COPY
+        with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as ex:
+            futs = {ex.submit(_load_one, pool, p): p for p in all_csvs}
+            for fut in as_completed(futs):
+                fut.result()
 
         print("[INFO] All CSV files have been processed.")
+
+        conn = pool.getconn()
+        try:
+            create_search_indexes(conn)
+        finally:
+            pool.putconn(conn)
     finally:
-        conn.close()
-        print("[INFO] DB connection closed.")
+        pool.closeall()
+        print("[INFO] DB connection pool closed.")
 
     # CSV 적재가 다 끝난 뒤 LangFlow에게 "준비 완료" 신호
     start_ready_server_once(host="127.0.0.1", port=8002)
@@ -136,6 +136,10 @@ def _find_ccit_root_from_e01(e01_path: Path) -> Path:
     return e01_path.parent
 
 # ── AIM helpers ───────────────────────────────────────────────────
+# aim_cli 출력 한 줄마다 검사하므로 모듈 로드 시 한 번만 컴파일
+_AIM_DEVICE_RE = re.compile(r"Device number\s+(\d+)")
+_AIM_PHYSICAL_RE = re.compile(r"Device is .*PhysicalDrive(\d+)", re.IGNORECASE)
+
 def mount_e01(e01_path: Path):
     cmd = [
         AIM_EXE,
@@ -158,10 +162,10 @@ def mount_e01(e01_path: Path):
         assert proc.stdout
         for line in proc.stdout:
             line = line.strip()
-            m_dev = re.search(r"Device number\s+(\d+)", line)
+            m_dev = _AIM_DEVICE_RE.search(line)
             if m_dev:
                 device_number = m_dev.group(1)
-            m_phy = re.search(r"Device is .*PhysicalDrive(\d+)", line, re.IGNORECASE)
+            m_phy = _AIM_PHYSICAL_RE.search(line)
             if m_phy:
                 disk_number = int(m_phy.group(1))
             if "Mounted online" in line or "Mounted read only" in line:
@@ -1,11 +1,35 @@
 # -*- coding: utf-8 -*-
 import os
+import bisect
 import re
 import csv
+import functools
+import multiprocessing
 from datetime import datetime
-from typing import Optional, Dict, List, Tuple
+from collections import defaultdict
+from typing import BinaryIO, Optional, DefaultDict, Dict, List, Tuple
 from pathlib import Path
 
+_FNAME_RE = re.compile(r"(\d{14})_PECmd_Output\.csv$")
+_VOLUME_RE = re.compile(r"^\\VOLUME\{[^}]+\}", re.IGNORECASE)
+_LASTRUN_RE = re.compile(r"(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)")
+
+# Kape Output 탐색 시 내려가지 않을 폴더 (parser/artifacts.py 의 타깃 복사본, 로그)
+_SKIP_WALK_DIRS = frozenset({"artifacts", "logs"})
+
+# '~' 로 패밀리를 묶는 패키지 파일 확장자
+_PKG_SUFFIXES = (".MUM", ".CAT", ".MAN")
+
+# 모든 행에 공통으로 붙는 기본 태그 (정렬된 상태로 고정)
+# TIME_* 태그는 항상 이 뒤에 정렬되므로 뒤에 이어 붙이기만 하면 된다.
+_BASE_TAG_STR = ",".join(sorted({
+    "ARTIFACT_PREFETCH",
+    "AREA_WINDOWS",
+    "AREA_PREFETCH",
+    "EVENT_EXECUTED",
+    "STATE_ACTIVE",
+}))
+
 # ===============================
 # 0. 파일명에서 기준 시각(ref_time) 추출
 # ===============================
@@ -14,7 +38,7 @@ def parse_ref_time_from_filename(filename: str) -> Optional[datetime]:
     r"""
     예: 20251126183954_PECmd_Output.csv -> 2025-11-26 18:39:54 로 변환
     """
-    m = re.match(r"(\d{14})_PECmd_Output\.csv$", filename)
+    m = _FNAME_RE.match(filename)
     if not m:
         return None
     ts_str = m.group(1)
@@ -51,6 +75,10 @@ def find_pecmd_csvs_under_ccit() -> List[Tuple[Path, Optional[datetime]]]:
         print(f"[DEBUG] 드라이브 {drive_root} 의 Kape Output 탐색: {kape_root}")
 
         for root, dirs, files in os.walk(str(kape_root)):
+            # KAPE 타깃 원본 복사본(Artifacts)과 로그 폴더에는 PECmd CSV가 없으므로
+            # 하위로 내려가지 않도록 가지치기 (파일 수가 가장 많은 서브트리)
+            dirs[:] = [d for d in dirs if d.lower() not in _SKIP_WALK_DIRS]
+
             for name in files:
                 if not name.endswith("_PECmd_Output.csv"):
                     continue
@@ -116,7 +144,9 @@ def normalize_volume(path: str) -> str:
     path = path.strip()
     if not path:
         return ""
-    path = re.sub(r"^\\VOLUME\{[^}]+\}", r"C:", path, flags=re.IGNORECASE)
+    # 대부분은 이미 C:\... 형태이므로 \VOLUME{ 로 시작할 때만 정규식 적용
+    if path[:8].upper() == "\\VOLUME{":
+        return _VOLUME_RE.sub("C:", path)
     return path
 
 def shorten_dir_path(path: str) -> str:
@@ -127,12 +157,13 @@ def shorten_dir_path(path: str) -> str:
     """
     if not path:
         return path
-    parts = path.split("\\")
-    if len(parts) <= 4:
+    # 구분자가 4개 미만이면(= 4조각 이하) 축약할 필요 없으므로 split 생략
+    if path.count("\\") < 4:
         return path
+    parts = path.split("\\")
     drive = parts[0]
     first = parts[1]
-    tail = "\\".join(parts[-2:])
+    tail = parts[-2] + "\\" + parts[-1]
     return f"{drive}\\{first}\\...\\{tail}"
 
 def summarize_files_in_dir(files: List[str]) -> str:
@@ -143,26 +174,23 @@ def summarize_files_in_dir(files: List[str]) -> str:
       MICROSOFT-WINDOWS-XXXX-PACKAGE (xN) 형태로 표현
     - 그 외 일반 파일은 그대로 표시
     """
-    base_map: Dict[str, List[str]] = {}
+    base_map: DefaultDict[str, List[str]] = defaultdict(list)
 
     for name in files:
         if not name:
             continue
 
-        upper = name.upper()
-
         # 패키지 계열: MICROSOFT-...~31BF... 처럼 '~'가 들어가는 애들
-        if "~" in name and (upper.endswith(".MUM") or upper.endswith(".CAT") or upper.endswith(".MAN")):
+        if "~" in name and name.upper().endswith(_PKG_SUFFIXES):
             base = name.split("~", 1)[0]  # 첫 번째 ~ 앞까지를 "패밀리"로 사용
         else:
             base = name  # 그냥 일반 파일
 
-        base_map.setdefault(base, []).append(name)
+        base_map[base].append(name)
 
     summarized_items: List[str] = []
 
-    for base in sorted(base_map.keys()):
-        group = base_map[base]
+    for base, group in sorted(base_map.items()):
         if len(group) == 1:
             # 한 개만 있으면 원래 파일 이름 그대로
             summarized_items.append(group[0])
@@ -189,23 +217,30 @@ def summarize_files_list(raw_str: str) -> str:
     paths = [normalize_volume(p) for p in raw_str.split(",") if p.strip()]
 
     # 2) 디렉터리 → 파일 목록 매핑
-    dir_to_files: Dict[str, List[str]] = {}
+    #    (값은 dict 를 순서 유지 set 처럼 사용: 중복 검사 O(1))
+    dir_to_files: Dict[str, Dict[str, None]] = {}
 
     for p in paths:
-        dir_path = os.path.dirname(p)
-        file_name = os.path.basename(p)
+        # 윈도우 경로 전용: os.path.dirname/basename 대신 rpartition 한 번으로 분리
+        head, sep, tail = p.rpartition("\\")
+        if sep:
+            # 드라이브 루트(C:\)는 os.path.dirname 과 같이 '\' 를 유지
+            dir_path = head + sep if head.endswith(":") else head
+            file_name = tail
+        else:
+            dir_path, file_name = "", p
         if not dir_path and not file_name:
             continue
 
-        dir_to_files.setdefault(dir_path, [])
-        if file_name and file_name not in dir_to_files[dir_path]:
-            dir_to_files[dir_path].append(file_name)
+        seen = dir_to_files.setdefault(dir_path, {})
+        if file_name:
+            seen[file_name] = None
 
     # 3) 디렉터리별 요약 문자열 생성
     segments: List[str] = []
 
     for dir_path in sorted(dir_to_files.keys()):
-        files = dir_to_files[dir_path]
+        files = list(dir_to_files[dir_path])
 
         # 파일 목록을 패밀리 기준으로 다시 요약
         files_str = summarize_files_in_dir(files)
@@ -229,20 +264,23 @@ def summarize_directories(raw_str: str) -> str:
     if not raw_str:
         return ""
 
-    dirs = [normalize_volume(d) for d in raw_str.split(",") if d.strip()]
-    dirs = list(set(dirs))
+    dirs = {normalize_volume(d) for d in raw_str.split(",") if d.strip()}
+
+    # 정렬된 목록에서는 같은 접두사로 시작하는 문자열들이 항상 연속 구간에 모인다.
+    # -> 접두사(d.rstrip("\\") + "\\") 구간의 시작을 bisect 로 찾아서 상위 디렉터리인지 판단 (O(N log N))
+    #    (끝이 '\'인 경로는 접두사와 자기 자신이 같으므로 그 한 칸은 건너뛴다)
+    # 출력은 원래 문자열 그대로 (C:\ 같은 드라이브 루트 / 끝의 '\' 유지)
+    keys = sorted(dirs)
 
     leaf_dirs: List[str] = []
     for d in dirs:
-        is_prefix = False
-        for other in dirs:
-            if d == other:
-                continue
-            if other.startswith(d.rstrip("\\") + "\\"):
-                is_prefix = True
-                break
-        if not is_prefix:
-            leaf_dirs.append(d)
+        prefix = d.rstrip("\\") + "\\"
+        i = bisect.bisect_left(keys, prefix)
+        if i < len(keys) and keys[i] == d:
+            i += 1
+        if i < len(keys) and keys[i].startswith(prefix):
+            continue
+        leaf_dirs.append(d)
 
     short_leaf = [shorten_dir_path(d) for d in leaf_dirs]
     return ", ".join(sorted(short_leaf))
@@ -252,10 +290,12 @@ def summarize_directories(raw_str: str) -> str:
 # 3. TIME 태그: LastRun 기준
 # ===============================
 
+@functools.lru_cache(maxsize=4096)
 def parse_lastrun(last_run_str: str) -> Optional[datetime]:
     """
     PECmd LastRun 문자열을 datetime으로 변환.
     - 문자열 안에서 'YYYY-MM-DD HH:MM:SS(.ffffff)' 패턴만 뽑아서 파싱
+    - 같은 LastRun 값이 여러 행에 반복되므로 결과를 캐시한다
     """
     if not last_run_str:
         return None
@@ -266,9 +306,7 @@ def parse_lastrun(last_run_str: str) -> Optional[datetime]:
 
     s = s.replace("T", " ")
 
-    m = re.search(
-        r"(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)", s
-    )
+    m = _LASTRUN_RE.search(s)
     if m:
         core = m.group(1)
     else:
@@ -277,96 +315,134 @@ def parse_lastrun(last_run_str: str) -> Optional[datetime]:
         except ValueError:
             return None
 
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f"):
-        try:
-            return datetime.strptime(core, fmt)
-        except ValueError:
-            continue
-
+    # 정규식이 'YYYY-MM-DD<공백>HH:MM:SS(.f{1,6})' 형태를 보장하므로
+    # strptime 대신 위치 슬라이스로 바로 datetime 생성
+    date_part = core[:10]
+    time_part = core[10:].lstrip()
     try:
-        return datetime.fromisoformat(core)
+        return datetime(
+            int(date_part[0:4]), int(date_part[5:7]), int(date_part[8:10]),
+            int(time_part[0:2]), int(time_part[3:5]), int(time_part[6:8]),
+            int(time_part[9:].ljust(6, "0")) if len(time_part) > 8 else 0,
+        )
     except ValueError:
+        # 형식은 맞지만 날짜 값 자체가 잘못된 경우 (예: 13월, 2월 30일)
+        # -> strptime / fromisoformat 으로 다시 시도해도 똑같이 실패하므로 바로 None
+        return None
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+# |ref - LastRun| 일수 구간 경계 (이하 기준) 와 구간별 TIME 태그 (정렬된 상태)
+_TIME_BUCKET_BOUNDS = (1.0, 7.0, 30.0)
+_TIME_BUCKET_TAGS = (
+    ("TIME_ACCESSED", "TIME_RECENT"),
+    ("TIME_ACCESSED", "TIME_WEEK"),
+    ("TIME_ACCESSED", "TIME_MONTH"),
+    ("TIME_ACCESSED", "TIME_OLD"),
+)
+
+
+def to_epoch_seconds(dt: Optional[datetime]) -> Optional[float]:
+    """
+    datetime -> 1970-01-01 기준 초 (naive 는 로컬 변환 없이 그대로 계산)
+    """
+    if dt is None:
         return None
+    if dt.tzinfo is not None:
+        return dt.timestamp()
+    return (dt - _EPOCH).total_seconds()
 
 
-def get_time_tags(last_run: Optional[datetime],
-                  ref_time: Optional[datetime]) -> List[str]:
+def get_time_tags(last_run_ts: Optional[float],
+                  ref_ts: Optional[float]) -> Tuple[str, ...]:
     """
     - LastRun이 존재하면: TIME_ACCESSED
     - ref_time 과 LastRun 차이 절댓값 기준으로
       RECENT / WEEK / MONTH / OLD 중 **하나만** 붙인다.
-    """
-    tags: List[str] = []
-    if last_run:
-        tags.append("TIME_ACCESSED")
 
-    if last_run and ref_time:
-        diff = ref_time - last_run
-        days = abs(diff.total_seconds()) / 86400.0
+    인자는 to_epoch_seconds() 로 변환한 초 단위 값.
+    (ref_ts 는 파일마다 한 번만 계산해서 넘긴다)
+    """
+    if last_run_ts is None:
+        return ()
+    if ref_ts is None:
+        return ("TIME_ACCESSED",)
 
-        # 가장 좁은 구간 하나만 선택 (if / elif)
-        if days <= 1:
-            tags.append("TIME_RECENT")
-        elif days <= 7:
-            tags.append("TIME_WEEK")
-        elif days <= 30:
-            tags.append("TIME_MONTH")
-        elif days > 30:
-            tags.append("TIME_OLD")
+    days = abs(ref_ts - last_run_ts) * (1.0 / 86400.0)
 
-    return tags
+    # 가장 좁은 구간 하나만 선택 (if/elif 대신 경계 배열에서 bisect)
+    return _TIME_BUCKET_TAGS[bisect.bisect_left(_TIME_BUCKET_BOUNDS, days)]
 
 
 # ===============================
 # 4. output 파일명 충돌 처리 (_v1, _v2 ...)
 # ===============================
 
-def ensure_unique_output_path(path: Path) -> Path:
+def open_unique_output(path: Path) -> Tuple[Path, BinaryIO]:
     """
     이미 같은 이름의 파일이 있으면
     base_Tagged_v1.csv, base_Tagged_v2.csv ... 식으로
-    사용 가능한 새 경로를 돌려준다.
-    """
-    if not path.exists():
-        return path
+    사용 가능한 새 경로를 골라 바로 쓰기용으로 연다.
 
+    여러 프로세스가 동시에 태깅하므로 "확인 후 열기"를 하면 같은 이름을 함께 고를 수 있다.
+    -> "xb"(배타적 생성)로 열고, 이미 있으면 다음 번호로 넘어간다.
+    """
     base, ext = os.path.splitext(str(path))
-    idx = 1
+    candidate = path
+    idx = 0
     while True:
-        candidate = Path(f"{base}_v{idx}{ext}")
-        if not candidate.exists():
-            return candidate
-        idx += 1
+        try:
+            return candidate, open(candidate, "xb", buffering=1 << 20)
+        except FileExistsError:
+            idx += 1
+            candidate = Path(f"{base}_v{idx}{ext}")
+
+
+# ===============================
+# 5. 출력 CSV 필드 인용 (csv.writer QUOTE_MINIMAL 과 동일 규칙)
+# ===============================
+
+def csv_field(value: str) -> str:
+    """
+    쉼표 / 큰따옴표 / 줄바꿈이 없으면 그대로,
+    있으면 "..." 로 감싸고 내부 " 는 "" 로 이스케이프.
+    """
+    if "," in value or '"' in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
 
 # ===============================
 # 6. description 빌더
 # ===============================
 
-def build_description(row: Dict[str, str]) -> str:
+# description 에서 제외할 컬럼 (별도 컬럼이거나 필요 없는 값)
+_DESC_EXCLUDE_KEYS = frozenset({
+    "LastRun", "Tags", "tag",
+    "SourceAccessed", "Note", "Version"
+})
+
+
+def description_columns(header: List[str]) -> List[Tuple[int, str]]:
+    """
+    헤더에서 description 에 들어갈 (컬럼 위치, 컬럼 이름) 목록을 한 번만 계산.
+    (모든 행의 키가 같으므로 행마다 제외 키를 검사할 필요 없음)
+    """
+    return [(i, key) for i, key in enumerate(header) if key not in _DESC_EXCLUDE_KEYS]
+
+
+def build_description(columns: List[Tuple[int, str]], values: List[str]) -> str:
     """
-    한 행(row)에서:
+    한 행(values)에서:
       - LastRun / Tags / tag / SourceAccessed / Note / Version 은
-        별도 컬럼이거나 필요 없으니까 description에서 제외
+        별도 컬럼이거나 필요 없으니까 description에서 제외 (description_columns)
       - 나머지 컬럼은 "Key:Value" 형태로 이어붙여 descrition 생성
     구분자: " | "
     """
-    exclude_keys = {
-        "LastRun", "Tags", "tag",
-        "SourceAccessed", "Note", "Version"
-    }
-
-    parts: List[str] = []
-    for key, val in row.items():
-        if key in exclude_keys:
-            continue
-        if val is None:
-            continue
-        s = str(val).strip()
-        if not s:
-            continue
-        parts.append(f"{key}:{s}")
-    return " | ".join(parts)
+    return " | ".join(
+        f"{key}:{s}" for i, key in columns if (s := values[i].strip())
+    )
 
 
 # ===============================
@@ -377,12 +453,14 @@ def build_description(row: Dict[str, str]) -> str:
 def tag_prefetch_csv(input_path: Path,
                      ref_time: Optional[datetime],
                      output_dir: Path,
-                     case_name: Optional[str]) -> Path:
+                     case_name: Optional[str],
+                     chunk_size: int = 10_000) -> Path:
     """
     - input_path: *_PECmd_Output.csv 전체 경로
     - ref_time  : 파일명에서 뽑은 기준 시각
     - output_dir: <드라이브>:\tagged 디렉터리
     - case_name : Kape Output 하위 1단계 폴더 이름 (예: Jo, Terry)
+    - chunk_size: 한 번에 모아서 기록할 행 수 (메모리 사용량 상한)
 
     최종 출력 컬럼:
       1) type               -> "ARTIFACT_PREFETCH" 고정
@@ -401,60 +479,86 @@ def tag_prefetch_csv(input_path: Path,
     else:
         output_filename = f"{base_no_ext}_Tagged.csv"
 
-    output_path = ensure_unique_output_path(output_dir / output_filename)
+    output_path, f_out = open_unique_output(output_dir / output_filename)
 
-    with input_path.open("r", encoding="utf-8-sig", newline="") as f_in, \
-         output_path.open("w", encoding="utf-8-sig", newline="") as f_out:
+    with f_out, input_path.open("r", encoding="utf-8-sig", newline="") as f_in:
 
-        reader = csv.DictReader(f_in)
+        reader = csv.reader(f_in)
 
-        # 최종 컬럼은 공통 4개
-        fieldnames = ["type", "lastwritetimestemp", "descrition", "tag"]
-        writer = csv.DictWriter(f_out, fieldnames=fieldnames)
-        writer.writeheader()
+        # 헤더 -> 컬럼 위치 매핑 (행마다 dict 를 만들지 않고 위치로 접근)
+        header = next(reader, None) or []
+        idx = {name: i for i, name in enumerate(header)}
 
-        for row in reader:
-            tags: List[str] = []
+        # Directories / FilesLoaded 컬럼이 없으면 요약 결과를 담을 자리를 뒤에 추가
+        for col in ("Directories", "FilesLoaded"):
+            if col not in idx:
+                idx[col] = len(header)
+                header.append(col)
+        n_cols = len(header)
+
+        i_dirs = idx["Directories"]
+        i_dirs_loaded = idx.get("DirectoriesLoaded")
+        i_files = idx["FilesLoaded"]
+        i_source = idx.get("SourceFilename")
+        i_last_run = idx.get("LastRun")
+        desc_columns = description_columns(header)
+
+        # 최종 컬럼은 공통 4개 (스키마가 고정이라 csv.writer 없이 직접 기록)
+        # 바이너리 모드: BOM(utf-8-sig) 을 한 번 쓰고, 이후는 chunk 단위로 utf-8 인코딩
+        f_out.write(b"\xef\xbb\xbf")
+        f_out.write(b"type,lastwritetimestemp,descrition,tag\r\n")
+
+        buf: List[str] = []
 
-            # ===== 기본 태그 =====
-            tags.append("ARTIFACT_PREFETCH")
-            tags.append("AREA_WINDOWS")
-            tags.append("AREA_PREFETCH")
-            tags.append("EVENT_EXECUTED")
-            tags.append("STATE_ACTIVE")
+        # 기준 시각은 파일 단위로 고정이므로 초 단위 값으로 한 번만 변환
+        ref_ts = to_epoch_seconds(ref_time)
+
+        for row in reader:
+            # 빈 줄은 건너뜀 (DictReader 와 동일)
+            if not row:
+                continue
+            if len(row) < n_cols:
+                row.extend([""] * (n_cols - len(row)))
 
             # ===== Directories / FilesLoaded 요약 =====
-            orig_dirs = row.get("Directories", "") or row.get("DirectoriesLoaded", "")
-            orig_files = row.get("FilesLoaded", "")
+            orig_dirs = row[i_dirs]
+            if not orig_dirs and i_dirs_loaded is not None:
+                orig_dirs = row[i_dirs_loaded]
+            orig_files = row[i_files]
 
-            row["Directories"] = summarize_directories(orig_dirs)
-            row["FilesLoaded"] = summarize_files_list(orig_files)
+            row[i_dirs] = summarize_directories(orig_dirs)
+            row[i_files] = summarize_files_list(orig_files)
 
             # ===== SourceFilename: 경로 제거, 파일명만 =====
-            if "SourceFilename" in row:
-                row["SourceFilename"] = os.path.basename(row["SourceFilename"] or "")
+            if i_source is not None:
+                row[i_source] = row[i_source].rpartition("\\")[2].rpartition("/")[2]
 
             # ===== TIME 태그 (LastRun 기준) =====
-            last_run_str = row.get("LastRun", "") or ""
-            last_run_dt = parse_lastrun(last_run_str)
-            tags.extend(get_time_tags(last_run_dt, ref_time))
+            last_run_str = row[i_last_run] if i_last_run is not None else ""
+            last_run_ts = to_epoch_seconds(parse_lastrun(last_run_str))
+            time_tags = get_time_tags(last_run_ts, ref_ts)
 
             # ===== descrition 생성 =====
-            desc = build_description(row)
-
-            # ===== tag 문자열 정리 =====
-            tags = sorted(set(tags))
-            tag_str = ",".join(tags)
-
-            # ===== 최종 출력용 row 구성 =====
-            out_row = {
-                "type": "ARTIFACT_PREFETCH",
-                "lastwritetimestemp": last_run_str.strip(),
-                "descrition": desc,
-                "tag": tag_str,
-            }
-
-            writer.writerow(out_row)
+            desc = build_description(desc_columns, row)
+
+            # ===== tag 문자열 정리 (기본 태그 + TIME 태그) =====
+            if time_tags:
+                tag_str = _BASE_TAG_STR + "," + ",".join(time_tags)
+            else:
+                tag_str = _BASE_TAG_STR
+
+            # ===== 최종 출력용 row 구성 (chunk_size 행 단위로 모아서 기록) =====
+            # tag 는 항상 쉼표를 포함하므로 고정으로 따옴표 처리
+            buf.append(
+                f'ARTIFACT_PREFETCH,{csv_field(last_run_str.strip())},'
+                f'{csv_field(desc)},"{tag_str}"\r\n'
+            )
+            if len(buf) >= chunk_size:
+                f_out.write("".join(buf).encode("utf-8"))
+                buf.clear()
+
+        if buf:
+            f_out.write("".join(buf).encode("utf-8"))
 
     return output_path
 
@@ -463,6 +567,33 @@ def tag_prefetch_csv(input_path: Path,
 # 8. main (D:~Z: + Kape Output 스캔)
 # ===============================
 
+def _tag_one(input_path: Path, ref_time: Optional[datetime]) -> Path:
+    """
+    PECmd CSV 한 개를 태깅한다. (multiprocessing 워커에서 호출되므로 모듈 최상위에 둔다)
+    """
+    print(f"[+] 입력 파일: {input_path}")
+    if ref_time:
+        print(f"    -> 파일명 기준 기준 시각(ref_time): {ref_time}")
+    else:
+        print("    -> ref_time 없음 (TIME_RECENT/WEEK/MONTH/OLD 태그는 생략될 수 있음)")
+
+    # Kape Output 하위 1단계 폴더명(case) 추출
+    case_name = get_kape_child_folder_name(input_path)
+    if case_name:
+        print(f"    -> Kape Output CASE 폴더: {case_name}")
+    else:
+        print("    -> Kape Output CASE 폴더를 찾지 못함 (파일명에 CASE 미반영)")
+
+    # 출력 디렉터리: 드라이브 루트의 tagged (예: D:\tagged)
+    drive = input_path.drive or "D:"
+    output_dir = Path(drive + "\\tagged")
+    print(f"    -> 출력 디렉터리: {output_dir}")
+
+    output_path = tag_prefetch_csv(input_path, ref_time, output_dir, case_name)
+    print(f"    -> 태깅 완료. 결과 파일: {output_path}")
+    return output_path
+
+
 def main():
     print("[PECmd] D:~Z: + 'Kape Output' 경로에서 *_PECmd_Output.csv 탐색 중...")
 
@@ -471,27 +602,15 @@ def main():
         print("[-] *_PECmd_Output.csv 파일을 찾지 못했습니다.")
         return
 
-    for input_path, ref_time in candidates:
-        print(f"[+] 입력 파일: {input_path}")
-        if ref_time:
-            print(f"    -> 파일명 기준 기준 시각(ref_time): {ref_time}")
-        else:
-            print("    -> ref_time 없음 (TIME_RECENT/WEEK/MONTH/OLD 태그는 생략될 수 있음)")
-
-        # Kape Output 하위 1단계 폴더명(case) 추출
-        case_name = get_kape_child_folder_name(input_path)
-        if case_name:
-            print(f"    -> Kape Output CASE 폴더: {case_name}")
-        else:
-            print("    -> Kape Output CASE 폴더를 찾지 못함 (파일명에 CASE 미반영)")
-
-        # 출력 디렉터리: 드라이브 루트의 tagged (예: D:\tagged)
-        drive = input_path.drive or "D:"
-        output_dir = Path(drive + "\\tagged")
-        print(f"    -> 출력 디렉터리: {output_dir}")
+    # 파일끼리는 서로 독립이므로 CPU 코어 수만큼 프로세스로 나눠서 태깅
+    workers = min(len(candidates), os.cpu_count() or 1)
+    if workers <= 1:
+        for input_path, ref_time in candidates:
+            _tag_one(input_path, ref_time)
+        return
 
-        output_path = tag_prefetch_csv(input_path, ref_time, output_dir, case_name)
-        print(f"    -> 태깅 완료. 결과 파일: {output_path}")
+    with multiprocessing.Pool(processes=workers) as pool:
+        pool.starmap(_tag_one, candidates)
 
 
 def run(*args, **kwargs):
@@ -1,10 +1,15 @@
+import os
+import queue
 import threading
 import traceback
 import time
 
-import psycopg2
+import numpy as np
+
 from psycopg2.extras import DictCursor
+from psycopg2.pool import ThreadedConnectionPool
 
+import torch
 from sentence_transformers import SentenceTransformer
 from pymilvus import (
     connections,
@@ -45,8 +50,17 @@ EMBED_DIM = 384
 # 워커 수
 NUM_WORKERS = 5
 
-# 한 번에 처리할 PostgreSQL row 수
-BATCH_SIZE = 96
+# 한 번에 조회할 PostgreSQL row 수 (fetchmany 단위)
+DB_BATCH_SIZE = 2000
+
+# Milvus insert 1회에 모아서 보낼 row 수 (flush는 파이프라인 종료 시 1회)
+INSERT_BATCH_SIZE = 10000
+
+# model.encode 내부 배치 크기 (패딩 / 메모리 적정선)
+EMBED_BATCH_SIZE = 64
+
+# 워커 내부 fetch → embed → insert 단계 사이 큐에 쌓아둘 최대 배치 수
+PIPELINE_DEPTH = 2
 
 # description + type/time/tag 합친 text 4000자 제한
 MAX_TEXT_LEN = 4000
@@ -65,9 +79,60 @@ def log(level, who, msg):
 log("INFO", "MAIN", f"임베딩 모델 로딩 중: {ST_MODEL_NAME}")
 model = SentenceTransformer(ST_MODEL_NAME)
 model.max_seq_length = 512  # 최대 512 토큰
+if torch.cuda.is_available():
+    # GPU 사용 가능 시 fp16으로 올려서 배치 인코딩 처리량 확보
+    model = model.to("cuda").half()
+    log("INFO", "MAIN", "CUDA 감지 → 모델을 GPU(fp16)로 이동")
+else:
+    # CPU 인코딩: 워커 스레드들이 동시에 encode 하므로 코어를 나눠서 과다 구독 방지
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // NUM_WORKERS))
 log("INFO", "MAIN", "임베딩 모델 로딩 완료")
 
 
+# =========================
+# 1-1. PostgreSQL 커넥션 풀 (전역 공유)
+# =========================
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+
+
+def get_pg_pool():
+    """
+    /run-embed 호출마다 워커별로 새로 connect 하지 않도록
+    커넥션 풀을 처음 한 번만 만들고 이후 재사용.
+    (워커 NUM_WORKERS개 + 메인 조회용 1개)
+    """
+    global _pg_pool
+    with _pg_pool_lock:
+        if _pg_pool is None or _pg_pool.closed:
+            # minconn == maxconn: putconn 은 유휴 커넥션이 minconn 미만일 때만 보관하고
+            # 나머지는 close 하므로, 둘을 같게 둬야 호출 사이에 전부 살아남는다
+            _pg_pool = ThreadedConnectionPool(
+                NUM_WORKERS + 1, NUM_WORKERS + 1, **DB_CONFIG
+            )
+        return _pg_pool
+
+
+def get_pg_conn(pool):
+    """
+    풀에서 살아있는 커넥션 하나를 꺼낸다.
+    커넥션이 HTTP 호출 사이에 유지되므로, PostgreSQL 재시작 등으로 끊긴 커넥션은
+    SELECT 1 로 확인해서 버리고(close=True) 새로 받는다.
+    """
+    for _ in range(NUM_WORKERS + 2):
+        conn = pool.getconn()
+        try:
+            if not conn.closed:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+                return conn
+        except Exception:
+            pass
+        pool.putconn(conn, close=True)
+    raise RuntimeError("PostgreSQL 커넥션 획득 실패 (풀의 커넥션이 모두 끊김)")
+
+
 # =========================
 # 2. Milvus 연결 & 컬렉션 준비
 # =========================
@@ -119,10 +184,11 @@ def init_milvus():
     log("INFO", "MAIN", f"컬렉션 '{MILVUS_COLLECTION}' 새로 생성 완료 (필드: id, text, vector)")
 
     # 인덱스 생성 (검색용)
+    # HNSW: IVF_FLAT의 nlist 학습 없이 세그먼트 단위로 그래프 구축, 검색 지연 낮음
     index_params = {
-        "index_type": "IVF_FLAT",
+        "index_type": "HNSW",
         "metric_type": "COSINE",
-        "params": {"nlist": 1024},
+        "params": {"M": 16, "efConstruction": 200},
     }
     log("INFO", "MAIN", "벡터 인덱스 생성 중 ...")
     coll.create_index(field_name="vector", index_params=index_params)
@@ -140,7 +206,7 @@ def get_collection():
 # =========================
 # 3. 텍스트 전처리 (type / time / tag 포함)
 # =========================
-def build_text(row):
+def build_text(t, ts, tag, desc):
     """
     임베딩에 사용할 텍스트 구성:
     - type
@@ -148,41 +214,43 @@ def build_text(row):
     - tag
     - description
     전부 합쳐서 하나의 text로 만들고, 4000자 초과 시 잘라냄.
+    (SELECT 컬럼 순서 그대로 튜플 값을 받음)
     """
-    t = row.get("type") or ""
-    ts = row.get("lastwritetimestamp") or ""
-    tag = row.get("tag") or ""
-    desc = row.get("description") or ""
+    # 빈 값(None / "")은 filter로 건너뜀 → 중간 list 없이 한 번에 join
+    text = " | ".join(filter(None, (
+        t and f"[type] {t}",
+        ts and f"[time] {ts}",
+        tag and f"[tag] {tag}",
+        desc,
+    )))
 
-    parts = []
-    if t:
-        parts.append(f"[type] {t}")
-    if ts:
-        parts.append(f"[time] {ts}")
-    if tag:
-        parts.append(f"[tag] {tag}")
-    if desc:
-        parts.append(desc)
-
-    text = " | ".join(parts)
-
-    if len(text) > MAX_TEXT_LEN:
-        text = text[:MAX_TEXT_LEN]
-
-    return text
+    # 길이 이하면 슬라이스가 원본 객체를 그대로 반환
+    return text[:MAX_TEXT_LEN]
 
 
 # =========================
-# 4. 워커 함수: id % NUM_WORKERS 기준 분할
+# 4. 워커 함수: id 범위 [id_lo, id_hi) 기준 분할
 # =========================
-def worker(worker_idx, summary_list):
+def split_id_ranges(min_id, max_id, n):
+    """
+    [min_id, max_id] 구간을 n개의 연속 범위 [lo, hi)로 분할.
+    modulo 분할과 달리 각 워커가 id 인덱스를 범위 스캔으로 사용할 수 있음.
+    """
+    step = (max_id - min_id) // n + 1
+    return [(min_id + i * step, min_id + (i + 1) * step) for i in range(n)]
+
+
+def worker(worker_idx, id_lo, id_hi, summary_list):
     name = f"Worker-{worker_idx}"
-    log("INFO", name, "시작")
+    log("INFO", name, f"시작 (id 범위 [{id_lo}, {id_hi}))")
 
-    # PostgreSQL 연결
+    # PostgreSQL 연결 (풀에서 대여)
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor(cursor_factory=DictCursor)
+        pool = get_pg_pool()
+        conn = get_pg_conn(pool)
+        # named cursor → 서버 측 커서: 쿼리 1회 실행 후 fetchmany로 이어서 스트리밍
+        # (기본 튜플 row 사용 → row마다 dict 생성 생략)
+        cur = conn.cursor(name=f"embed_w{worker_idx}")
         log("INFO", name, "PostgreSQL 연결 성공")
     except Exception as e:
         log("ERROR", name, f"PostgreSQL 연결 실패: {e}")
@@ -196,15 +264,21 @@ def worker(worker_idx, summary_list):
     except Exception as e:
         log("ERROR", name, f"Milvus 컬렉션 핸들 획득 실패: {e}")
         traceback.print_exc()
-        conn.close()
+        pool.putconn(conn)
         summary_list.append(f"[{name}] Milvus 컬렉션 핸들 획득 실패: {e}")
         return
 
-    last_id = 0
     total_processed = 0
 
-    try:
-        while True:
+    # 3단계 파이프라인: fetch(PostgreSQL) → embed(현재 스레드) → insert(Milvus)
+    # 단계 사이 큐 크기를 제한해서 앞 단계가 너무 앞서가지 않도록 함 (backpressure)
+    q_fetch = queue.Queue(maxsize=PIPELINE_DEPTH)
+    q_insert = queue.Queue(maxsize=PIPELINE_DEPTH)
+    # embed 단계가 실패하면 fetch 단계가 남은 id 범위를 계속 읽지 않도록 멈춤 신호
+    stop = threading.Event()
+
+    def fetch_stage():
+        try:
             cur.execute(
                 f"""
                 SELECT
@@ -214,70 +288,118 @@ def worker(worker_idx, summary_list):
                     tag,
                     description
                 FROM {RESULT_TABLE}
-                WHERE id > %s
-                  AND (id %% %s) = %s
-                ORDER BY id
-                LIMIT %s;
+                WHERE id >= %s
+                  AND id < %s
+                ORDER BY id;
                 """,
-                (last_id, NUM_WORKERS, worker_idx, BATCH_SIZE),
+                (id_lo, id_hi),
             )
-            rows = cur.fetchall()
+            while not stop.is_set():
+                rows = cur.fetchmany(DB_BATCH_SIZE)
+                if not rows:
+                    log("INFO", name, "더 이상 처리할 행 없음. 조회 종료.")
+                    break
+                q_fetch.put(rows)
+        except Exception as e:
+            log("ERROR", name, f"PostgreSQL 조회 실패: {e}")
+            traceback.print_exc()
+            summary_list.append(f"[{name}] PostgreSQL 조회 실패: {e}")
+        finally:
+            q_fetch.put(None)
+
+    def insert_stage():
+        # 여러 embed 배치를 INSERT_BATCH_SIZE까지 모아서 한 번에 insert (작은 세그먼트 남발 방지)
+        buf_ids, buf_texts, buf_vecs = [], [], []
+
+        def insert_buffer():
+            # concatenate 포함 전부 try 안에서 처리 → insert 스레드가 죽어서 q_insert.put이 막히는 일 방지
+            try:
+                embeddings = buf_vecs[0] if len(buf_vecs) == 1 else np.concatenate(buf_vecs)
+                insert_result = coll.insert([buf_ids, buf_texts, embeddings])
+                # auto_id=False라 primary_keys는 넣은 id 그대로 → 개수만 출력
+                log("INFO", name, f"Milvus insert 완료 ({insert_result.insert_count}개)")
+            except Exception as e:
+                log("ERROR", name, f"Milvus insert 실패: {e}")
+                traceback.print_exc()
+                summary_list.append(f"[{name}] Milvus insert 실패: {e}")
+            buf_ids.clear()
+            buf_texts.clear()
+            buf_vecs.clear()
 
-            if not rows:
-                log("INFO", name, f"더 이상 처리할 행 없음. 종료. (총 처리 {total_processed} 행)")
+        while True:
+            item = q_insert.get()
+            if item is None:
                 break
+            ids, texts, embeddings = item
+            buf_ids.extend(ids)
+            buf_texts.extend(texts)
+            buf_vecs.append(embeddings)
+            if len(buf_ids) >= INSERT_BATCH_SIZE:
+                insert_buffer()
 
-            last_id = rows[-1]["id"]
-            batch_count = len(rows)
-            total_processed += batch_count
+        if buf_ids:
+            insert_buffer()
 
-            log("INFO", name, f"{batch_count}개 row 조회 (last_id={last_id}, 누적={total_processed})")
+    fetcher = threading.Thread(target=fetch_stage, name=f"{name}-fetch")
+    inserter = threading.Thread(target=insert_stage, name=f"{name}-insert")
+    fetcher.start()
+    inserter.start()
 
-            texts = []
-            ids = []
+    try:
+        while True:
+            rows = q_fetch.get()
+            if rows is None:
+                break
+
+            last_id = rows[-1][0]
+            batch_count = len(rows)
+            total_processed += batch_count
 
-            for r in rows:
-                text = build_text(r)
-                texts.append(text)
-                ids.append(int(r["id"]))
+            # row = (id, type, lastwritetimestamp, tag, description) → 컬럼 단위로 전치 후 map
+            ids, types, times, tags, descs = zip(*rows)
+            ids = list(ids)
+            texts = list(map(build_text, types, times, tags, descs))
 
             t0 = time.time()
-            embeddings = model.encode(
-                texts,
-                batch_size=len(texts),
-                convert_to_numpy=True,
-                show_progress_bar=False,
-            )
+            with torch.inference_mode():
+                embeddings = model.encode(
+                    texts,
+                    batch_size=EMBED_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,  # COSINE 인덱스 → 정규화 벡터면 내적과 동일
+                    show_progress_bar=False,
+                )
             t1 = time.time()
 
-            log("INFO", name, f"임베딩 완료 ({batch_count}개, {t1 - t0:.2f}초 소요)")
+            # 배치당 로그는 한 줄만 (조회 + 임베딩 결과를 합쳐서 출력)
+            log(
+                "INFO",
+                name,
+                f"{batch_count}개 임베딩 완료 ({t1 - t0:.2f}초, last_id={last_id}, 누적={total_processed})",
+            )
 
-            data = [
-                ids,
-                texts,
-                embeddings.tolist(),
-            ]
+            # (N, EMBED_DIM) float32 연속 버퍼 그대로 전달 → 행 단위 list 변환 생략
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
-            try:
-                insert_result = coll.insert(data)
-                log(
-                    "INFO",
-                    name,
-                    f"Milvus insert 완료 ({batch_count}개) - 예: {insert_result.primary_keys[:3]}{'...' if len(insert_result.primary_keys) > 3 else ''}",
-                )
-            except Exception as e:
-                log("ERROR", name, f"Milvus insert 실패: {e}")
-                traceback.print_exc()
-                summary_list.append(f"[{name}] Milvus insert 실패: {e}")
+            q_insert.put((ids, texts, embeddings))
 
     except Exception as e:
         log("ERROR", name, f"worker 내부 예외: {e}")
         traceback.print_exc()
         summary_list.append(f"[{name}] worker 내부 예외: {e}")
+        # fetch 단계에 멈춤 신호 → 이미 큐에 들어간 배치만 비우고 종료 (None)까지 대기
+        stop.set()
+        while q_fetch.get() is not None:
+            pass
     finally:
+        q_insert.put(None)
+        fetcher.join()
+        inserter.join()
         try:
-            conn.close()
-            log("INFO", name, "PostgreSQL 연결 종료")
+            # 진행 중인 트랜잭션(named cursor 포함)은 putconn에서 rollback 후 풀에 보관됨
+            # (끊긴 커넥션은 풀이 보관하지 않고 버림 → 다음 대여 시 새로 연결)
+            pool.putconn(conn)
+            log("INFO", name, "PostgreSQL 연결 반환")
         except Exception:
             pass
 
@@ -300,12 +422,18 @@ def run_milvus_embedding_pipeline():
         return msg
 
     total_rows = None
+    min_id = max_id = None
+    conn = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        pool = get_pg_pool()
+        conn = get_pg_conn(pool)
         with conn.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute(f"SELECT COUNT(*) AS cnt FROM {RESULT_TABLE};")
-            total_rows = cur.fetchone()["cnt"]
-            msg = f"{RESULT_TABLE} 총 행 수: {total_rows}"
+            cur.execute(
+                f"SELECT COUNT(*) AS cnt, MIN(id) AS min_id, MAX(id) AS max_id FROM {RESULT_TABLE};"
+            )
+            row = cur.fetchone()
+            total_rows, min_id, max_id = row["cnt"], row["min_id"], row["max_id"]
+            msg = f"{RESULT_TABLE} 총 행 수: {total_rows} (id {min_id} ~ {max_id})"
             log("INFO", "MAIN", msg)
             main_summary.append(msg)
     except Exception as e:
@@ -314,17 +442,23 @@ def run_milvus_embedding_pipeline():
         traceback.print_exc()
         main_summary.append(msg)
     finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        if conn is not None:
+            try:
+                pool.putconn(conn)
+            except Exception:
+                pass
 
     worker_summaries = []
     threads = []
-    for idx in range(NUM_WORKERS):
+    id_ranges = [] if min_id is None else split_id_ranges(min_id, max_id, NUM_WORKERS)
+    if not id_ranges:
+        log("WARN", "MAIN", "id 범위를 구하지 못해 워커를 실행하지 않음")
+        main_summary.append("id 범위 없음 → 워커 미실행")
+
+    for idx, (id_lo, id_hi) in enumerate(id_ranges):
         t = threading.Thread(
             target=worker,
-            args=(idx, worker_summaries),
+            args=(idx, id_lo, id_hi, worker_summaries),
             name=f"Worker-{idx}",
         )
         threads.append(t)
@@ -340,6 +474,8 @@ def run_milvus_embedding_pipeline():
 
     try:
         coll = get_collection()
+        # 워커 insert 중에는 flush하지 않고, 전체 완료 후 한 번만 flush (num_entities도 이후 정확)
+        coll.flush()
         milvus_count = coll.num_entities
         msg = f"Milvus 컬렉션 '{MILVUS_COLLECTION}' 엔티티 수: {milvus_count}"
         log("INFO", "MAIN", msg)